@@ -0,0 +1,183 @@
+"""
+Mesh cleanup kernels on plain NumPy arrays.
+
+No bpy/bmesh imports: callers in _meshutil pull arrays out of Blender with
+foreach_get and write results back. Kernels can therefore run off the main
+thread, be used outside Blender, or be swapped for a compiled build without
+touching the scripts.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional: not bundled with Blender, NumPy is the fallback
+    njit = None
+
+def find_doubles(co, dist=0.0001):
+    """Map each vertex to the vertex it merges into, like remove_doubles.
+
+    co is an (N, 3) array. Exact duplicates collapse first in one sort.
+    The remaining points are merged greedily in vertex order without
+    chaining: each vertex not yet claimed claims the unclaimed vertices
+    within dist of it, so no vertex ends up more than dist from its target.
+    Candidates come from the 27 surrounding grid cells, walked as nine
+    contiguous runs of the cell-sorted points.
+    Returns the target index of every vertex (always a lower index), or None
+    when there is nothing to merge.
+    """
+    n = len(co)
+    if n < 2:
+        return None
+
+    # Exact duplicates (UV seams, split normals): one stable lexsort on the
+    # coordinate bits, so each run starts with its lowest vertex index
+    pts = np.asarray(co, dtype=np.float64) + 0.0  # + 0.0 turns -0.0 into 0.0
+    bits = pts.view(np.int64).reshape(n, 3)
+    order = np.lexsort((bits[:, 2], bits[:, 1], bits[:, 0]))
+    sorted_bits = bits[order]
+    starts = np.r_[True, (sorted_bits[1:] != sorted_bits[:-1]).any(1)]
+    first = order[starts]
+
+    # Number the distinct points in vertex order, so the greedy pass below
+    # runs in vertex order like remove_doubles
+    by_index = np.argsort(first)
+    rank = np.empty_like(by_index)
+    rank[by_index] = np.arange(by_index.size)
+    inverse = np.empty(n, dtype=np.int64)
+    inverse[order] = rank[np.cumsum(starts) - 1]
+    first = first[by_index]
+    uniq = pts[first]
+
+    m = len(uniq)
+    target = np.arange(m)
+    if m > 1:
+        _claim_near(uniq, dist, target)
+
+    keep = first[target[inverse]]
+    if np.array_equal(keep, np.arange(n)):
+        return None
+    return keep
+
+def _claim_near(points, dist, target):
+    """Greedy, non-chaining merge of distinct points closer than dist (in place)."""
+    low = points.min(0)
+    # Cells are at least dist wide (so neighbours are in adjacent cells) and
+    # few enough per axis to pack a cell into one int64 key
+    cell = max(dist, float((points.max(0) - low).max()) / (1 << 20))
+    cells = np.floor((points - low) / cell).astype(np.int64) + 1
+    keys = cells[:, 0] | (cells[:, 1] << 21) | (cells[:, 2] << 42)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    # The x-1..x+1 cells of each neighbouring (y, z) row are one sorted run
+    row_offsets = [(dy << 21) + (dz << 42) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+
+    def runs(k):
+        # Needles are sorted too, which keeps searchsorted fast
+        lo = [np.searchsorted(sorted_keys, k + off - 1, 'left') for off in row_offsets]
+        hi = [np.searchsorted(sorted_keys, k + off + 1, 'right') for off in row_offsets]
+        return np.stack(lo, 1), np.stack(hi, 1)
+
+    # Only points with another point nearby need the per-point greedy step
+    nearby = np.zeros(len(points), dtype=np.int64)
+    for off in row_offsets:
+        nearby += (np.searchsorted(sorted_keys, sorted_keys + off + 1, 'right') -
+                   np.searchsorted(sorted_keys, sorted_keys + off - 1, 'left'))
+    crowded_pos = np.flatnonzero(nearby > 1)
+    lo, hi = runs(sorted_keys[crowded_pos])
+
+    # Visit crowded points in vertex order
+    crowded = order[crowded_pos]
+    visit = np.argsort(crowded)
+    crowded, lo, hi = crowded[visit], lo[visit], hi[visit]
+
+    claimed = np.zeros(len(points), dtype=np.bool_)
+    for v, v_lo, v_hi in zip(crowded, lo, hi):
+        if claimed[v]:
+            continue
+        claimed[v] = True
+        cand = np.concatenate([order[a:b] for a, b in zip(v_lo, v_hi)])
+        cand = cand[~claimed[cand]]
+        near = cand[((points[cand] - points[v]) ** 2).sum(1) <= dist * dist]
+        target[near] = v
+        claimed[near] = True
+
+def boundary_edges(loop_edges, n_edges):
+    """Return a bool mask of edges used by exactly one face.
+
+    loop_edges holds the edge index of every face corner (loops.edge_index).
+    """
+    faces_per_edge = np.bincount(loop_edges, minlength=n_edges)
+    return faces_per_edge == 1
+
+def _classify_legs_numpy(centers_z, normals_z, threshold, z_threshold, out):
+    out[:] = (centers_z < threshold) & (np.abs(normals_z) < z_threshold)
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _classify_legs_numba(centers_z, normals_z, threshold, z_threshold, out):
+        # One streaming pass, no temporary boolean arrays
+        for i in prange(centers_z.size):
+            out[i] = 1 if (centers_z[i] < threshold and abs(normals_z[i]) < z_threshold) else 0
+
+def classify_legs(centers_z, normals_z, threshold, z_threshold):
+    """Return an int32 array: 1 for leg faces, 0 for the rest.
+
+    A leg face is below threshold and mostly vertical (|normal z| < z_threshold).
+    Runs as a parallel numba kernel when numba is installed.
+    """
+    out = np.empty(centers_z.size, dtype=np.int32)
+    kernel = _classify_legs_numba if njit is not None else _classify_legs_numpy
+    kernel(centers_z, normals_z, threshold, z_threshold, out)
+    return out
+
+def find_leg_threshold(heights, bottom, extent, default_fraction=0.185,
+                       min_fraction=0.05, min_gap_fraction=0.02):
+    """Return the height below which faces count as legs.
+
+    Looks for gaps between the face heights in the lowest quarter of faces;
+    legs usually sit apart from the body there. Of the gaps at least
+    min_gap_fraction of extent wide, and at least min_fraction of extent
+    above the bottom (so sole caps alone never win), the one nearest the
+    default_fraction prior is used: the face just below it sets the
+    threshold. Without such a gap, returns bottom + extent * default_fraction.
+    """
+    default = bottom + extent * default_fraction
+    k = heights.size // 4
+    if k < 2:
+        return default
+
+    # Only the lowest quarter needs ordering, not every face
+    lower = np.sort(np.partition(heights, k)[:k + 1])
+    gaps = np.diff(lower)
+    below = lower[:-1]
+    candidates = below[(gaps >= extent * min_gap_fraction) &
+                       (below >= bottom + extent * min_fraction)]
+    if candidates.size == 0:
+        return default
+    return float(candidates[np.argmin(np.abs(candidates - default))])
+
+if __name__ == "__main__":
+    # Self-check without Blender: python _meshkernels.py
+    # Vertices 2e-5 apart merge even across a grid-cell edge
+    keep = find_doubles(np.array([[0, 0, 9e-5], [0, 0, 1.1e-4], [1, 1, 1]]))
+    assert keep.tolist() == [0, 0, 2], keep
+    assert find_doubles(np.array([[0, 0, 4e-5], [0, 0, 6e-5]])).tolist() == [0, 0]
+    # Vertices farther apart than dist stay split
+    assert find_doubles(np.array([[0, 0, 0], [1.5e-4, 0, 0]])) is None
+    # A chain of points 0.6*dist apart merges pairwise, it does not collapse
+    chain = np.zeros((10, 3))
+    chain[:, 0] = np.arange(10) * 0.6e-4
+    assert find_doubles(chain).tolist() == [0, 0, 2, 2, 4, 4, 6, 6, 8, 8], find_doubles(chain)
+    # Large clusters of coincident and near-coincident vertices stay linear
+    cluster = np.r_[np.zeros((20000, 3)), np.random.default_rng(0).random((20000, 3)) * 1e-5]
+    assert not find_doubles(cluster).any()
+
+    # Low-poly legs: sole caps at 0, side quads centred at 0.1, dense body
+    # from 0.2 up. The threshold must cover the leg sides, not just the soles.
+    heights = np.r_[np.zeros(4), np.full(4, 0.1), np.linspace(0.2, 1.0, 90)]
+    assert find_leg_threshold(heights, 0.0, 1.0) == 0.1
+    # No clear gap: fall back to the 18.5% prior
+    assert abs(find_leg_threshold(np.linspace(0, 1, 100), 0.0, 1.0) - 0.185) < 1e-9
+    print("_meshkernels self-check passed")
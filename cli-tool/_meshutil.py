@@ -0,0 +1,331 @@
+"""
+Shared mesh helpers for the Blender fix-up scripts.
+
+Import from a script run with
+`blender --background --factory-startup --python <script>.py`.
+
+Scripts built on load_model/save_model take .glb or .blend paths. Writing a
+.blend and passing it to the next script skips the GLB export/import between
+steps of a pipeline.
+"""
+
+import bpy
+import bmesh
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from _meshkernels import boundary_edges, find_doubles
+
+# Input hashes that a script already processed without changing anything
+FIX_CACHE_PATH = os.path.expanduser("~/.cache/furnitech/fix_cache.json")
+
+def deselect_objects():
+    """Deselect every object without going through the operator system."""
+    for obj in bpy.context.selected_objects:
+        obj.select_set(False)
+
+def object_override(obj):
+    """Context override that makes obj the only active/selected object.
+
+    Pair with deselect_objects() so edit mode does not pick up other
+    selected meshes.
+    """
+    return bpy.context.temp_override(
+        active_object=obj,
+        object=obj,
+        edit_object=obj,
+        selected_objects=[obj],
+        selected_editable_objects=[obj]
+    )
+
+@contextmanager
+def edit_mode(obj):
+    """Enter edit mode on obj only for the block and yield its edit BMesh."""
+    with object_override(obj):
+        bpy.ops.object.mode_set(mode='EDIT')
+        try:
+            yield bmesh.from_edit_mesh(obj.data)
+        finally:
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+@contextmanager
+def object_bmesh(obj):
+    """Yield a BMesh of obj's mesh in object mode and write it back on exit."""
+    bm = bmesh.new()
+    bm.from_mesh(obj.data)
+    try:
+        yield bm
+        bm.to_mesh(obj.data)
+        obj.data.update()
+    finally:
+        bm.free()
+
+def deselect_mesh(mesh):
+    """Clear vertex, edge and face selection on mesh data (object mode)."""
+    for elems in (mesh.vertices, mesh.edges, mesh.polygons):
+        elems.foreach_set("select", np.zeros(len(elems), dtype=np.bool_))
+
+def reset_scene():
+    """Reset to an empty factory scene in one call, dropping all old data."""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+def load_model(input_path):
+    """Load a GLB (or a cached .blend) into a fresh scene and return its mesh objects."""
+    if input_path.endswith('.blend'):
+        # Much faster than re-importing the GLB when chaining scripts
+        bpy.ops.wm.open_mainfile(filepath=input_path)
+    else:
+        reset_scene()
+        bpy.ops.import_scene.gltf(filepath=input_path)
+
+    return [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+
+def save_model(output_path, draco=False, **export_options):
+    """Export the scene as GLB, or save it as a .blend cache for the next script.
+
+    draco=True Draco-compresses the mesh data for smaller files that load
+    faster downstream. export_options override the glTF exporter defaults.
+    """
+    if output_path.endswith('.blend'):
+        bpy.ops.wm.save_as_mainfile(filepath=output_path)
+        return
+
+    # Texcoords stay on even for scripts that never touch UVs: the models are
+    # textured, and dropping UVs would break them. Normals need no export-time
+    # work either, since Blender 4.1+ caches them on the mesh.
+    options = dict(
+        filepath=output_path,
+        export_format='GLB',
+        export_texcoords=True,
+        export_normals=True,
+        export_materials='EXPORT',
+        export_cameras=False,
+        export_lights=False,
+        # Reuse already-encoded PNG/JPEG images instead of re-encoding them
+        export_image_format='AUTO',
+        export_draco_mesh_compression_enable=draco,
+        export_draco_mesh_compression_level=6,
+        export_draco_position_quantization=14,
+        export_draco_normal_quantization=10,
+        export_draco_texcoord_quantization=12
+    )
+    options.update(export_options)
+    bpy.ops.export_scene.gltf(**options)
+
+def _read_vectors(elems, attr):
+    """Read a 3-vector attribute of every element in one foreach_get, shape (n, 3) float32."""
+    n = len(elems)
+    data = np.empty(n * 3, dtype=np.float32)
+    elems.foreach_get(attr, data)
+    return data.reshape(n, 3)
+
+def vertex_coords(mesh):
+    """Return mesh's vertex coordinates in object space, shape (n_verts, 3) float32."""
+    return _read_vectors(mesh.vertices, "co")
+
+def face_centers(mesh):
+    """Return mesh's face centers in object space, shape (n_faces, 3) float32."""
+    return _read_vectors(mesh.polygons, "center")
+
+def face_normals(mesh):
+    """Return mesh's unit face normals in object space, shape (n_faces, 3) float32."""
+    return _read_vectors(mesh.polygons, "normal")
+
+def merge_doubles_all(objs, dist=0.0001):
+    """Merge duplicate vertices on every mesh of objs (object mode).
+
+    Duplicates are found with find_doubles() instead of remove_doubles'
+    KD-tree, one mesh per worker thread when there is more than one mesh.
+    They are then welded on the main thread with bmesh.ops.weld_verts, so UVs
+    and faces stay intact. Returns the number of vertices removed for each
+    object; already clean meshes are left untouched.
+    """
+    meshes = list(dict.fromkeys(obj.data for obj in objs))
+
+    coords = [vertex_coords(mesh) for mesh in meshes]
+
+    if len(meshes) > 1:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            keeps = list(pool.map(lambda co: find_doubles(co, dist), coords))
+    else:
+        keeps = [find_doubles(co, dist) for co in coords]
+
+    removed = {}
+    for mesh, keep in zip(meshes, keeps):
+        if keep is None:
+            removed[mesh] = 0
+            continue
+
+        dups = np.nonzero(keep != np.arange(len(keep)))[0]
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        bm.verts.ensure_lookup_table()
+        verts = bm.verts
+        bmesh.ops.weld_verts(bm, targetmap={verts[i]: verts[keep[i]] for i in dups})
+        bm.to_mesh(mesh)
+        bm.free()
+        mesh.update()
+        removed[mesh] = int(dups.size)
+
+    return [removed[obj.data] for obj in objs]
+
+def delete_loose(bm):
+    """Delete loose edges and vertices, like bpy.ops.mesh.delete_loose()."""
+    loose_edges = [e for e in bm.edges if not e.link_faces]
+    bmesh.ops.delete(bm, geom=loose_edges, context='EDGES')
+    loose_verts = [v for v in bm.verts if not v.link_edges]
+    bmesh.ops.delete(bm, geom=loose_verts, context='VERTS')
+
+def count_boundary_edges(mesh):
+    """Count edges used by exactly one face, i.e. open hole boundaries (object mode)."""
+    loop_edges = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("edge_index", loop_edges)
+    return int(np.count_nonzero(boundary_edges(loop_edges, len(mesh.edges))))
+
+def world_transform(obj):
+    """Return obj's world matrix as float32 (R, t), for `co @ R.T + t`.
+
+    Convert once per object and reuse for every array that needs it.
+    """
+    M = np.array(obj.matrix_world, dtype=np.float32)
+    return M[:3, :3], M[:3, 3]
+
+def world_bounds(obj):
+    """Return (min, max) of the object's bounding box in world space."""
+    corners = np.array(obj.bound_box, dtype=np.float32)
+    R, t = world_transform(obj)
+    world = corners @ R.T + t
+    return world.min(0), world.max(0)
+
+def world_face_centers(obj):
+    """Return obj's face centers in world space, shape (n_faces, 3) float32.
+
+    One foreach_get plus one matmul, no per-face matrix_world multiplies.
+    """
+    R, t = world_transform(obj)
+    return face_centers(obj.data) @ R.T + t
+
+def world_face_data(obj):
+    """Return (bbox_min, bbox_max, centers) of obj in world space, all float32."""
+    mn, mx = world_bounds(obj)
+    return mn, mx, world_face_centers(obj)
+
+def world_face_normals(obj):
+    """Return obj's unit face normals in world space, shape (n_faces, 3).
+
+    Normals go through the inverse-transpose of the world matrix and are
+    renormalized, so scaled and non-uniformly scaled objects stay correct.
+    """
+    R, _ = world_transform(obj)
+    # Row vectors: n @ inv(R) == (inv(R).T @ n.T).T
+    world = face_normals(obj.data) @ np.linalg.pinv(R)
+    lengths = np.linalg.norm(world, axis=1, keepdims=True)
+    lengths[lengths == 0] = 1.0
+    return world / lengths
+
+# Mesh data the fix passes can change, as (collection, attribute, dtype, width)
+_SIGNATURE_ATTRS = (
+    ("vertices", "co", np.float32, 3),
+    ("edges", "vertices", np.int32, 2),
+    ("loops", "vertex_index", np.int32, 1),
+    ("polygons", "loop_total", np.int32, 1),
+    ("polygons", "use_smooth", np.bool_, 1),
+    ("polygons", "material_index", np.int32, 1),
+)
+
+def mesh_signature(mesh):
+    """Hash mesh geometry, face winding, smoothing and material slots (object mode).
+
+    Compare signatures from before and after a fix to tell whether it
+    changed anything.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for collection, attr, dtype, width in _SIGNATURE_ATTRS:
+        elems = getattr(mesh, collection)
+        data = np.empty(len(elems) * width, dtype=dtype)
+        elems.foreach_get(attr, data)
+        h.update(data.tobytes())
+    return h.hexdigest()
+
+def _file_hash(path):
+    """Hash a file's bytes in chunks so large GLBs are not read in one go."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _read_fix_cache():
+    try:
+        with open(FIX_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _record_noop(key):
+    """Remember a fix cache key whose run left every mesh unchanged."""
+    cache = _read_fix_cache()
+    cache[key] = {"status": "noop"}
+    os.makedirs(os.path.dirname(FIX_CACHE_PATH), exist_ok=True)
+    with open(FIX_CACHE_PATH, 'w') as f:
+        json.dump(cache, f)
+
+def run_fix(script, fix_mesh, input_path, output_path):
+    """Load a model, merge doubles, run fix_mesh(obj) on every mesh and save it.
+
+    The input is hashed once. If script already left these exact bytes
+    unchanged, the input is copied to output_path without importing it.
+    Blender still starts, but import, processing and export are skipped.
+    Otherwise, a run that changes no mesh (see mesh_signature) is recorded
+    for next time. The cache only applies when input and output share a
+    format. Returns False when the model has no meshes.
+    """
+    key = None
+    if os.path.splitext(input_path)[1] == os.path.splitext(output_path)[1]:
+        key = f"{script}:{_file_hash(input_path)}"
+        if _read_fix_cache().get(key, {}).get("status") == "noop":
+            if os.path.abspath(input_path) != os.path.abspath(output_path):
+                shutil.copyfile(input_path, output_path)
+            print(f"✓ Nothing to fix (cached), copied input to: {output_path}")
+            return True
+
+    print(f"📦 Loading: {input_path}")
+
+    # Load into a fresh scene
+    mesh_objects = load_model(input_path)
+
+    if not mesh_objects:
+        print("❌ No mesh objects found!")
+        return False
+
+    print(f"🔧 Processing {len(mesh_objects)} mesh(es)...")
+
+    # Deselect once; each mesh is then targeted via a context override
+    deselect_objects()
+
+    # Signatures to tell afterwards whether the passes changed anything
+    before = [mesh_signature(obj.data) for obj in mesh_objects]
+
+    # Remove doubles (merge vertices that are very close) on all meshes at once
+    removed = merge_doubles_all(mesh_objects)
+
+    for obj, count in zip(mesh_objects, removed):
+        print(f"\n   Processing: {obj.name}")
+        print(f"   Removed {count} duplicate vertices")
+        fix_mesh(obj)
+
+    if key and before == [mesh_signature(obj.data) for obj in mesh_objects]:
+        _record_noop(key)
+
+    print(f"\n💾 Saving: {output_path}")
+
+    # Export GLB (or save .blend cache)
+    save_model(output_path)
+
+    print("✅ Complete!")
+    return True
@@ -5,106 +5,93 @@ Close the bottom of furniture model by adding a solid base plane.
 This ensures there are no visible holes when viewing from below.
 
 Usage:
-    /Applications/Blender.app/Contents/MacOS/Blender --background --python close_bottom.py -- <input.glb> <output.glb>
+    /Applications/Blender.app/Contents/MacOS/Blender --background --factory-startup --python close_bottom.py -- <input.glb> <output.glb>
 """
 
 import bpy
 import sys
 import os
-import mathutils
+import bmesh
+import numpy as np
 
-def close_bottom(input_path, output_path):
-    """Add a solid bottom plane to close the model."""
-
-    print(f"📦 Loading: {input_path}")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _meshutil import deselect_mesh, deselect_objects, edit_mode, load_model, merge_doubles_all, object_bmesh, save_model, vertex_coords, world_bounds, world_transform
 
-    # Clear scene
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
+def _close_bottom(obj):
+    """Close the bottom of a single mesh.
 
-    # Import GLB
-    bpy.ops.import_scene.gltf(filepath=input_path)
+    Expects duplicate vertices to be merged already (merge_doubles_all).
+    """
 
-    # Get all mesh objects
-    mesh_objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+    # Get bounding box
+    mn, mx = world_bounds(obj)
+    min_x, min_y, min_z = mn
+    max_x, max_z = mx[0], mx[2]
 
-    if not mesh_objects:
-        print("❌ No mesh objects found!")
-        return False
+    print(f"   Bounds: X[{min_x:.3f}, {max_x:.3f}] Y[{min_y:.3f}] Z[{min_z:.3f}, {max_z:.3f}]")
 
-    print(f"🔧 Processing {len(mesh_objects)} mesh(es)...")
+    # Clean up first (object mode, no edit mode toggle needed)
+    with object_bmesh(obj) as bm:
+        bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
 
-    for obj in mesh_objects:
-        print(f"\n   Processing: {obj.name}")
+    # Select bottom vertices (lowest 5% of width in Y)
+    threshold_y = min_y + (max_x - min_x) * 0.05  # 5% of width
 
-        # Select and make active
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
+    # Transform all vertices to world space in one batch
+    R, t = world_transform(obj)
+    world = vertex_coords(obj.data) @ R.T + t
 
-        # Get bounding box
-        bbox = [obj.matrix_world @ mathutils.Vector(corner) for corner in obj.bound_box]
+    mask = world[:, 1] <= threshold_y
+    deselect_mesh(obj.data)
+    obj.data.vertices.foreach_set("select", mask)
+    obj.data.update_tag()
 
-        min_x = min(v.x for v in bbox)
-        max_x = max(v.x for v in bbox)
-        min_y = min(v.y for v in bbox)
-        min_z = min(v.z for v in bbox)
-        max_z = max(v.z for v in bbox)
+    bottom_count = int(np.count_nonzero(mask))
 
-        print(f"   Bounds: X[{min_x:.3f}, {max_x:.3f}] Y[{min_y:.3f}] Z[{min_z:.3f}, {max_z:.3f}]")
+    print(f"   Selected {bottom_count} bottom vertices")
 
-        # Enter edit mode
-        bpy.ops.object.mode_set(mode='EDIT')
+    if bottom_count > 0:
+        with edit_mode(obj):
+            # Fill bottom
+            bpy.ops.mesh.edge_face_add()
 
-        # Clean up first
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.remove_doubles(threshold=0.0001)
-        bpy.ops.mesh.normals_make_consistent(inside=False)
+            # Select all and recalculate normals
+            bpy.ops.mesh.select_all(action='SELECT')
+            bpy.ops.mesh.normals_make_consistent(inside=False)
 
-        # Select bottom vertices (lowest 10% in Y)
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.object.mode_set(mode='OBJECT')
+        print(f"   ✓ Closed bottom")
+    else:
+        print(f"   ⚠️  No bottom vertices found")
 
-        threshold_y = min_y + (max_x - min_x) * 0.05  # 5% of width
+def close_bottom(input_path, output_path):
+    """Add a solid bottom plane to close the model."""
 
-        bottom_verts = []
-        for v in obj.data.vertices:
-            world_co = obj.matrix_world @ v.co
-            if world_co.y <= threshold_y:
-                v.select = True
-                bottom_verts.append(v)
+    print(f"📦 Loading: {input_path}")
 
-        print(f"   Selected {len(bottom_verts)} bottom vertices")
+    # Load into a fresh scene
+    mesh_objects = load_model(input_path)
 
-        bpy.ops.object.mode_set(mode='EDIT')
+    if not mesh_objects:
+        print("❌ No mesh objects found!")
+        return False
 
-        if len(bottom_verts) > 0:
-            # Fill bottom
-            bpy.ops.mesh.edge_face_add()
+    print(f"🔧 Processing {len(mesh_objects)} mesh(es)...")
 
-            # Select all and recalculate normals
-            bpy.ops.mesh.select_all(action='SELECT')
-            bpy.ops.mesh.normals_make_consistent(inside=False)
+    # Deselect once; each mesh is then targeted via a context override
+    deselect_objects()
 
-            print(f"   ✓ Closed bottom")
-        else:
-            print(f"   ⚠️  No bottom vertices found")
+    # Remove doubles (merge vertices that are very close) on all meshes at once
+    removed = merge_doubles_all(mesh_objects)
 
-        # Return to object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
+    for obj, count in zip(mesh_objects, removed):
+        print(f"\n   Processing: {obj.name}")
+        print(f"   Removed {count} duplicate vertices")
+        _close_bottom(obj)
 
     print(f"\n💾 Saving: {output_path}")
 
-    # Export GLB
-    bpy.ops.export_scene.gltf(
-        filepath=output_path,
-        export_format='GLB',
-        export_texcoords=True,
-        export_normals=True,
-        export_materials='EXPORT',
-        export_cameras=False,
-        export_lights=False
-    )
+    # Export GLB (or save .blend cache)
+    save_model(output_path)
 
     print("✅ Complete!")
     return True
@@ -115,7 +102,7 @@ def main():
     if "--" in argv:
         argv = argv[argv.index("--") + 1:]
     else:
-        print("Usage: blender --background --python close_bottom.py -- <input.glb> <output.glb>")
+        print("Usage: blender --background --factory-startup --python close_bottom.py -- <input.glb> <output.glb>")
         return
 
     if len(argv) < 2:
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Run all bottom/hole fixes on a GLB model in a single Blender session.
+
+Imports the GLB once, runs every fix pass on each mesh in memory,
+then exports once. Equivalent to running these scripts one after another:
+1. fix_bottom_hole.py
+2. fix_holes_aggressive.py
+3. fix_bottom_normals.py
+4. fix_bottom_uvs.py
+
+Usage:
+    /Applications/Blender.app/Contents/MacOS/Blender --background --factory-startup --python fix_all.py -- <input.glb> <output.glb>
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _meshutil import deselect_objects, load_model, merge_doubles_all, save_model
+from fix_bottom_hole import _fix_hole
+from fix_holes_aggressive import _fix_holes_aggressive
+from fix_bottom_normals import _fix_normals
+from fix_bottom_uvs import _fix_uvs
+
+# Holes are filled before normals and UVs so new faces get fixed too
+FIX_PASSES = [
+    ("Fill holes", _fix_hole),
+    ("Fill holes (aggressive)", _fix_holes_aggressive),
+    ("Fix bottom normals", _fix_normals),
+    ("Fix bottom UVs", _fix_uvs),
+]
+
+def fix_all(input_path, output_path):
+    """Run every fix pass on a GLB model with one import and one export."""
+
+    print(f"📦 Loading: {input_path}")
+
+    # Load into a fresh scene
+    mesh_objects = load_model(input_path)
+
+    if not mesh_objects:
+        print("❌ No mesh objects found!")
+        return False
+
+    print(f"🔧 Processing {len(mesh_objects)} mesh(es)...")
+
+    # Deselect once; each mesh is then targeted via a context override
+    deselect_objects()
+
+    # Merge duplicate vertices once, up front, for every pass
+    removed = merge_doubles_all(mesh_objects)
+
+    for obj, count in zip(mesh_objects, removed):
+        print(f"\n   Processing: {obj.name}")
+        print(f"   Removed {count} duplicate vertices")
+        for name, fix in FIX_PASSES:
+            print(f"\n   ▶ {name}")
+            fix(obj)
+
+    print(f"\n💾 Saving: {output_path}")
+
+    # Export GLB (or save .blend cache)
+    save_model(output_path)
+
+    print("✅ Complete!")
+    return True
+
+def main():
+    """Main entry point."""
+    argv = sys.argv
+    if "--" in argv:
+        argv = argv[argv.index("--") + 1:]
+    else:
+        print("Usage: blender --background --factory-startup --python fix_all.py -- <input.glb> <output.glb>")
+        return
+
+    if len(argv) < 2:
+        print("Error: Need input and output file paths")
+        return
+
+    input_path = argv[0]
+    output_path = argv[1]
+
+    if not os.path.exists(input_path):
+        print(f"❌ Input file not found: {input_path}")
+        return
+
+    fix_all(input_path, output_path)
+
+if __name__ == "__main__":
+    main()
@@ -9,61 +9,41 @@ This script:
 4. Exports back to GLB
 
 Usage:
-    /Applications/Blender.app/Contents/MacOS/Blender --background --python fix_bottom_hole.py -- <input.glb> <output.glb>
+    /Applications/Blender.app/Contents/MacOS/Blender --background --factory-startup --python fix_bottom_hole.py -- <input.glb> <output.glb>
 """
 
 import bpy
 import sys
 import os
+import bmesh
 
-def fix_bottom_hole(input_path, output_path):
-    """Fix holes in GLB model."""
-
-    print(f"📦 Loading: {input_path}")
-
-    # Clear scene
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _meshutil import count_boundary_edges, edit_mode, object_bmesh, run_fix
 
-    # Import GLB
-    bpy.ops.import_scene.gltf(filepath=input_path)
+def _fix_hole(obj):
+    """Fill open boundary edges on a single mesh.
 
-    # Get all mesh objects
-    mesh_objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+    Returns the number of boundary edges found (0 if already closed).
+    Expects duplicate vertices to be merged already (merge_doubles_all).
+    """
 
-    if not mesh_objects:
-        print("❌ No mesh objects found!")
-        return False
+    # Recalculate normals (make them consistent)
+    with object_bmesh(obj) as bm:
+        bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
 
-    print(f"🔧 Processing {len(mesh_objects)} mesh(es)...")
+    # Count boundary edges (holes) from the mesh arrays, no operator needed
+    boundary_edges = count_boundary_edges(obj.data)
 
-    for obj in mesh_objects:
-        print(f"\n   Processing: {obj.name}")
+    if boundary_edges == 0:
+        print(f"   ✓ No holes found (already closed)")
+        return 0
 
-        # Select and make active
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-
-        # Enter edit mode
-        bpy.ops.object.mode_set(mode='EDIT')
-
-        # Select all
-        bpy.ops.mesh.select_all(action='SELECT')
-
-        # Remove doubles (merge vertices that are very close)
-        bpy.ops.mesh.remove_doubles(threshold=0.0001)
-
-        # Select all again
-        bpy.ops.mesh.select_all(action='SELECT')
-
-        # Recalculate normals (make them consistent)
-        bpy.ops.mesh.normals_make_consistent(inside=False)
-
-        # Deselect all
-        bpy.ops.mesh.select_all(action='DESELECT')
+    print(f"   Found {boundary_edges} boundary edges (holes)")
 
+    # Only enter edit mode when there is something to fill
+    with edit_mode(obj):
         # Select non-manifold edges (boundaries/holes)
+        bpy.ops.mesh.select_all(action='DESELECT')
         bpy.ops.mesh.select_non_manifold(
             extend=False,
             use_wire=False,
@@ -73,45 +53,19 @@ def fix_bottom_hole(input_path, output_path):
             use_verts=False
         )
 
-        # Count selected edges
-        bpy.ops.object.mode_set(mode='OBJECT')
-        selected_edges = sum(1 for e in obj.data.edges if e.select)
-
-        if selected_edges > 0:
-            print(f"   Found {selected_edges} boundary edges (holes)")
-
-            # Back to edit mode
-            bpy.ops.object.mode_set(mode='EDIT')
-
-            # Fill holes
-            bpy.ops.mesh.edge_face_add()
-
-            # Recalculate normals again
-            bpy.ops.mesh.select_all(action='SELECT')
-            bpy.ops.mesh.normals_make_consistent(inside=False)
+        # Fill holes
+        bpy.ops.mesh.edge_face_add()
 
-            print(f"   ✓ Filled holes")
-        else:
-            print(f"   ✓ No holes found (already closed)")
-
-        # Return to object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-    print(f"\n💾 Saving: {output_path}")
+        # Recalculate normals again
+        bpy.ops.mesh.select_all(action='SELECT')
+        bpy.ops.mesh.normals_make_consistent(inside=False)
 
-    # Export GLB
-    bpy.ops.export_scene.gltf(
-        filepath=output_path,
-        export_format='GLB',
-        export_texcoords=True,
-        export_normals=True,
-        export_materials='EXPORT',
-        export_cameras=False,
-        export_lights=False
-    )
+    print(f"   ✓ Filled holes")
+    return boundary_edges
 
-    print("✅ Complete!")
-    return True
+def fix_bottom_hole(input_path, output_path):
+    """Fix holes in GLB model."""
+    return run_fix("fix_bottom_hole", _fix_hole, input_path, output_path)
 
 def main():
     """Main entry point."""
@@ -120,12 +74,12 @@ def main():
     if "--" in argv:
         argv = argv[argv.index("--") + 1:]
     else:
-        print("Usage: blender --background --python fix_bottom_hole.py -- <input.glb> <output.glb>")
+        print("Usage: blender --background --factory-startup --python fix_bottom_hole.py -- <input.glb> <output.glb>")
         return
 
     if len(argv) < 2:
         print("Error: Need input and output file paths")
-        print("Usage: blender --background --python fix_bottom_hole.py -- <input.glb> <output.glb>")
+        print("Usage: blender --background --factory-startup --python fix_bottom_hole.py -- <input.glb> <output.glb>")
         return
 
     input_path = argv[0]
@@ -6,126 +6,81 @@ When faces point inward, they appear invisible/black from outside,
 creating the appearance of a "hole".
 
 Usage:
-    /Applications/Blender.app/Contents/MacOS/Blender --background --python fix_bottom_normals.py -- <input.glb> <output.glb>
+    /Applications/Blender.app/Contents/MacOS/Blender --background --factory-startup --python fix_bottom_normals.py -- <input.glb> <output.glb>
 """
 
-import bpy
 import sys
 import os
-import mathutils
+import bmesh
+import numpy as np
 
-def fix_bottom_normals(input_path, output_path):
-    """Fix normals on bottom faces."""
-
-    print(f"📦 Loading: {input_path}")
-
-    # Clear scene
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
-
-    # Import GLB
-    bpy.ops.import_scene.gltf(filepath=input_path)
-
-    # Get all mesh objects
-    mesh_objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
-
-    if not mesh_objects:
-        print("❌ No mesh objects found!")
-        return False
-
-    print(f"🔧 Processing {len(mesh_objects)} mesh(es)...")
-
-    for obj in mesh_objects:
-        print(f"\n   Processing: {obj.name}")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _meshutil import delete_loose, object_bmesh, run_fix, world_bounds, world_face_centers, world_face_normals
 
-        # Select and make active
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
+def _fix_normals(obj):
+    """Fix bottom face normals on a single mesh.
 
-        # Get bounding box
-        bbox = [obj.matrix_world @ mathutils.Vector(corner) for corner in obj.bound_box]
-        min_y = min(v.y for v in bbox)
-        max_y = max(v.y for v in bbox)
+    Returns the number of inverted bottom faces that were flipped.
+    Expects duplicate vertices to be merged already (merge_doubles_all).
+    """
 
-        print(f"   Y bounds: [{min_y:.3f}, {max_y:.3f}]")
+    # Get bounding box
+    mn, mx = world_bounds(obj)
+    min_y = mn[1]
+    max_y = mx[1]
 
-        # Enter edit mode
-        bpy.ops.object.mode_set(mode='EDIT')
+    print(f"   Y bounds: [{min_y:.3f}, {max_y:.3f}]")
 
-        # Step 1: Clean geometry
-        print(f"   Step 1: Cleaning geometry...")
-        bpy.ops.mesh.select_all(action='SELECT')
-        removed = bpy.ops.mesh.remove_doubles(threshold=0.0001)
-        bpy.ops.mesh.delete_loose()
+    # Step 1: Clean geometry
+    print(f"   Step 1: Cleaning geometry...")
+    with object_bmesh(obj) as bm:
+        delete_loose(bm)
 
         # Step 2: Recalculate ALL normals consistently
         print(f"   Step 2: Recalculating all normals...")
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.normals_make_consistent(inside=False)
+        bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
 
-        # Step 3: Select bottom faces and flip if needed
-        print(f"   Step 3: Checking bottom faces...")
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.object.mode_set(mode='OBJECT')
+    # Step 3: Select bottom faces and flip if needed
+    print(f"   Step 3: Checking bottom faces...")
 
-        # Find bottom faces (faces with center Y near min_y)
-        threshold_y = min_y + (max_y - min_y) * 0.15  # Bottom 15%
+    # Find bottom faces (faces with center Y near min_y)
+    threshold_y = min_y + (max_y - min_y) * 0.15  # Bottom 15%
 
-        bottom_faces = []
-        inverted_faces = []
+    # Get face centers and normals in world space in one batch
+    world_centers = world_face_centers(obj)
+    world_normals = world_face_normals(obj)
 
-        for poly in obj.data.polygons:
-            # Get face center
-            face_center = obj.matrix_world @ poly.center
+    # Bottom normals should point down (Y < 0); flip those pointing up
+    bottom_mask = world_centers[:, 1] <= threshold_y
+    inverted_mask = bottom_mask & (world_normals[:, 1] > 0)
 
-            if face_center.y <= threshold_y:
-                bottom_faces.append(poly)
+    bottom_count = int(np.count_nonzero(bottom_mask))
+    inverted_count = int(np.count_nonzero(inverted_mask))
 
-                # Check if normal points downward (Y < 0 = pointing down)
-                world_normal = obj.matrix_world.to_3x3() @ poly.normal
-                if world_normal.y > 0:  # Should point down, but points up
-                    inverted_faces.append(poly)
-                    poly.select = True
+    print(f"   Found {bottom_count} bottom faces")
+    print(f"   Found {inverted_count} inverted bottom faces")
 
-        print(f"   Found {len(bottom_faces)} bottom faces")
-        print(f"   Found {len(inverted_faces)} inverted bottom faces")
-
-        if len(inverted_faces) > 0:
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.flip_normals()
-            print(f"   ✓ Flipped {len(inverted_faces)} face normals")
-        else:
-            print(f"   ✓ All normals already correct")
-
-        # Step 4: Final consistency check
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.normals_make_consistent(inside=False)
-
-        # Step 5: Apply smooth shading
-        bpy.ops.mesh.faces_shade_smooth()
-
-        # Return to object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        print(f"   ✅ Complete")
+    if inverted_count > 0:
+        # No consistency pass afterwards: it would flip these faces back
+        with object_bmesh(obj) as bm:
+            bm.faces.ensure_lookup_table()
+            faces = bm.faces
+            bmesh.ops.reverse_faces(bm, faces=[faces[i] for i in np.nonzero(inverted_mask)[0]])
+        print(f"   ✓ Flipped {inverted_count} face normals")
+    else:
+        print(f"   ✓ All normals already correct")
 
-    print(f"\n💾 Saving: {output_path}")
+    # Step 4: Apply smooth shading
+    polys = obj.data.polygons
+    polys.foreach_set("use_smooth", np.ones(len(polys), dtype=np.bool_))
+    obj.data.update()
 
-    # Export GLB
-    bpy.ops.export_scene.gltf(
-        filepath=output_path,
-        export_format='GLB',
-        export_texcoords=True,
-        export_normals=True,
-        export_materials='EXPORT',
-        export_cameras=False,
-        export_lights=False
-    )
+    print(f"   ✅ Complete")
+    return inverted_count
 
-    print("✅ Complete!")
-    return True
+def fix_bottom_normals(input_path, output_path):
+    """Fix normals on bottom faces."""
+    return run_fix("fix_bottom_normals", _fix_normals, input_path, output_path)
 
 def main():
     """Main entry point."""
@@ -133,7 +88,7 @@ def main():
     if "--" in argv:
         argv = argv[argv.index("--") + 1:]
     else:
-        print("Usage: blender --background --python fix_bottom_normals.py -- <input.glb> <output.glb>")
+        print("Usage: blender --background --factory-startup --python fix_bottom_normals.py -- <input.glb> <output.glb>")
         return
 
     if len(argv) < 2:
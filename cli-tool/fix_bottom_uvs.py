@@ -6,79 +6,96 @@ After fixing normals, the bottom faces may have incorrect/missing UV coordinates
 causing wrong texture appearance.
 
 Usage:
-    /Applications/Blender.app/Contents/MacOS/Blender --background --python fix_bottom_uvs.py -- <input.glb> <output.glb>
+    /Applications/Blender.app/Contents/MacOS/Blender --background --factory-startup --python fix_bottom_uvs.py -- <input.glb> <output.glb>
 """
 
 import bpy
 import sys
 import os
-import mathutils
 import bmesh
+import numpy as np
 
-def fix_bottom_uvs(input_path, output_path):
-    """Fix UV mapping on bottom faces."""
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _meshutil import deselect_objects, edit_mode, load_model, object_bmesh, save_model, vertex_coords, world_bounds, world_face_centers, world_face_normals, world_transform
 
-    print(f"📦 Loading: {input_path}")
+# Bottoms with more faces than this use smart_project instead of a planar map
+PLANAR_UV_MAX_FACES = 5000
 
-    # Clear scene
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
+def _fix_uvs(obj):
+    """Fix UV mapping on the bottom faces of a single mesh."""
 
-    # Import GLB
-    bpy.ops.import_scene.gltf(filepath=input_path)
+    # Get bounding box
+    mn, mx = world_bounds(obj)
+    min_y = mn[1]
+    max_y = mx[1]
 
-    # Get all mesh objects
-    mesh_objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+    print(f"   Y bounds: [{min_y:.3f}, {max_y:.3f}]")
 
-    if not mesh_objects:
-        print("❌ No mesh objects found!")
-        return False
+    mesh = obj.data
+    if not mesh.uv_layers:
+        mesh.uv_layers.new()
 
-    print(f"🔧 Processing {len(mesh_objects)} mesh(es)...")
+    # Find bottom faces in object mode (one batch, no BMesh)
+    threshold_y = min_y + (max_y - min_y) * 0.15  # Bottom 15%
 
-    for obj in mesh_objects:
-        print(f"\n   Processing: {obj.name}")
+    polys = mesh.polygons
+    nf = len(polys)
+    world_centers = world_face_centers(obj)
 
-        # Select and make active
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
+    face_mask = world_centers[:, 1] <= threshold_y
+    bottom_faces_count = int(np.count_nonzero(face_mask))
 
-        # Get bounding box
-        bbox = [obj.matrix_world @ mathutils.Vector(corner) for corner in obj.bound_box]
-        min_y = min(v.y for v in bbox)
-        max_y = max(v.y for v in bbox)
+    print(f"   Found {bottom_faces_count} bottom faces")
 
-        print(f"   Y bounds: [{min_y:.3f}, {max_y:.3f}]")
+    # Only faces that point down are flat underside; the sides of legs and
+    # of the base share the band but would collapse to lines on XZ
+    down_mask = face_mask & (world_face_normals(obj)[:, 1] < -0.9)
+    down_faces_count = int(np.count_nonzero(down_mask))
 
-        # Enter edit mode
-        bpy.ops.object.mode_set(mode='EDIT')
+    loop_totals = np.empty(nf, dtype=np.int32)
+    polys.foreach_get("loop_total", loop_totals)
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
 
-        # Get BMesh
-        bm = bmesh.from_edit_mesh(obj.data)
-        uv_layer = bm.loops.layers.uv.verify()
+    if 0 < down_faces_count <= PLANAR_UV_MAX_FACES:
+        # Flat bottom: project straight down onto XZ, normalized to the unit
+        # square. The side faces keep their UVs. Like the smart_project
+        # fallback, the bottom reuses texture space already covered by the
+        # atlas; the underside samples the material as a plain tile, so the
+        # overlap is harmless and keeps the texel density of the rest
+        print(f"   Applying planar UV projection to {down_faces_count} downward faces...")
+        loop_mask = np.repeat(down_mask, loop_totals)
 
-        # Select bottom faces
-        threshold_y = min_y + (max_y - min_y) * 0.15  # Bottom 15%
+        R, t = world_transform(obj)
+        world_co = vertex_coords(mesh) @ R.T + t
 
-        bottom_faces_count = 0
-        for face in bm.faces:
-            # Get face center in world space
-            face_center_local = face.calc_center_median()
-            face_center_world = obj.matrix_world @ face_center_local
+        xz = world_co[loop_verts[loop_mask]][:, [0, 2]]
+        min_xz = xz.min(0)
+        size_xz = xz.max(0) - min_xz
+        size_xz[size_xz == 0] = 1.0
 
-            if face_center_world.y <= threshold_y:
-                face.select = True
-                bottom_faces_count += 1
-            else:
-                face.select = False
+        uv_data = mesh.uv_layers.active.data
+        uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        uv_data.foreach_get("uv", uvs)
+        uvs = uvs.reshape(-1, 2)
+        uvs[loop_mask] = (xz - min_xz) / size_xz
+        uv_data.foreach_set("uv", uvs.ravel())
 
-        bmesh.update_edit_mesh(obj.data)
+        print(f"   ✓ Applied planar UV projection")
 
-        print(f"   Found {bottom_faces_count} bottom faces")
+    elif bottom_faces_count > 0:
+        # No flat underside, or too large a one: fall back to smart_project on
+        # the whole band, which is the only UV write on this mesh
+        loop_mask = np.repeat(face_mask, loop_totals)
+        polys.foreach_set("select", face_mask)
 
-        if bottom_faces_count > 0:
-            # Option 1: Smart UV Project for bottom faces
+        # Select the vertices of those faces too, like BMesh face.select does
+        vert_mask = np.zeros(len(mesh.vertices), dtype=np.bool_)
+        vert_mask[loop_verts[loop_mask]] = True
+        mesh.vertices.foreach_set("select", vert_mask)
+        mesh.update_tag()
+
+        with edit_mode(obj):
             print(f"   Applying smart UV projection to bottom...")
 
             try:
@@ -105,30 +122,37 @@ def fix_bottom_uvs(input_path, output_path):
                 except Exception as e2:
                     print(f"   ⚠️  Projection failed: {e2}")
 
-        # Clean up BMesh
-        bm.free()
+    # Recalculate normals one more time
+    with object_bmesh(obj) as bm:
+        bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+
+    print(f"   ✅ Complete")
+
+def fix_bottom_uvs(input_path, output_path):
+    """Fix UV mapping on bottom faces."""
+
+    print(f"📦 Loading: {input_path}")
+
+    # Load into a fresh scene
+    mesh_objects = load_model(input_path)
+
+    if not mesh_objects:
+        print("❌ No mesh objects found!")
+        return False
 
-        # Select all and recalculate normals one more time
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.normals_make_consistent(inside=False)
+    print(f"🔧 Processing {len(mesh_objects)} mesh(es)...")
 
-        # Return to object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
+    # Deselect once; each mesh is then targeted via a context override
+    deselect_objects()
 
-        print(f"   ✅ Complete")
+    for obj in mesh_objects:
+        print(f"\n   Processing: {obj.name}")
+        _fix_uvs(obj)
 
     print(f"\n💾 Saving: {output_path}")
 
-    # Export GLB
-    bpy.ops.export_scene.gltf(
-        filepath=output_path,
-        export_format='GLB',
-        export_texcoords=True,
-        export_normals=True,
-        export_materials='EXPORT',
-        export_cameras=False,
-        export_lights=False
-    )
+    # Export GLB (or save .blend cache)
+    save_model(output_path)
 
     print("✅ Complete!")
     return True
@@ -139,7 +163,7 @@ def main():
     if "--" in argv:
         argv = argv[argv.index("--") + 1:]
     else:
-        print("Usage: blender --background --python fix_bottom_uvs.py -- <input.glb> <output.glb>")
+        print("Usage: blender --background --factory-startup --python fix_bottom_uvs.py -- <input.glb> <output.glb>")
         return
 
     if len(argv) < 2:
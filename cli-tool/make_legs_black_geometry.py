@@ -6,28 +6,38 @@ This is the proper way - select geometry by position (bottom parts = legs),
 then assign a separate black material to just those faces.
 
 Usage:
-    /Applications/Blender.app/Contents/MacOS/Blender --background --python make_legs_black_geometry.py -- <input.glb> <output.glb>
+    /Applications/Blender.app/Contents/MacOS/Blender --background --factory-startup --python make_legs_black_geometry.py -- <input.glb> <output.glb>
+
+Batch mode processes many files in one Blender launch, from a JSON manifest
+({"in.glb": "out.glb", ...} or [["in.glb", "out.glb"], ...]) or from every
+.glb in a directory:
+    ... --python make_legs_black_geometry.py -- --batch <manifest.json>
+    ... --python make_legs_black_geometry.py -- --batch <input_dir> <output_dir>
 """
 
 import bpy
 import sys
 import os
-import mathutils
+import json
+import numpy as np
 
-def make_legs_black(input_path, output_path):
-    """Apply black material to leg geometry only."""
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _meshkernels import find_leg_threshold
+from _meshutil import load_model, save_model, world_face_data
 
-    print(f"📦 Loading: {input_path}")
+AXIS_NAMES = ('x', 'y', 'z')
 
-    # Clear scene
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
+def make_legs_black(input_path, output_path, draco=False):
+    """Apply black material to leg geometry only (draco=True compresses the GLB)."""
 
-    # Import GLB
-    bpy.ops.import_scene.gltf(filepath=input_path)
+    print(f"📦 Loading: {input_path}")
 
-    # Get all mesh objects
-    mesh_objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+    # Load into a fresh scene, skipping hidden helpers and meshes without faces
+    mesh_objects = [
+        obj for obj in load_model(input_path)
+        if len(obj.data.polygons)
+        and not obj.hide_render and not obj.hide_get()
+    ]
 
     if not mesh_objects:
         print("❌ No mesh objects found!")
@@ -35,171 +45,154 @@ def make_legs_black(input_path, output_path):
 
     print(f"🔧 Processing {len(mesh_objects)} mesh(es)...")
 
+    # Create black material for legs once and share it (PURE BLACK, no reflections)
+    black_mat = bpy.data.materials.new(name="Black_Legs")
+    black_mat.use_nodes = True
+    bsdf = black_mat.node_tree.nodes["Principled BSDF"]
+    bsdf.inputs['Base Color'].default_value = (0.0, 0.0, 0.0, 1.0)  # Pure black
+    bsdf.inputs['Roughness'].default_value = 1.0  # Fully rough, no reflections
+    bsdf.inputs['Metallic'].default_value = 0.0  # Not metallic
+    bsdf.inputs['Specular IOR Level'].default_value = 0.0  # No specular highlights
+
     for obj in mesh_objects:
         print(f"\n   Processing: {obj.name}")
 
-        # Select and make active
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-
-        # Get bounding box
-        bbox = [obj.matrix_world @ mathutils.Vector(corner) for corner in obj.bound_box]
-        min_x = min(v.x for v in bbox)
-        max_x = max(v.x for v in bbox)
-        min_y = min(v.y for v in bbox)
-        max_y = max(v.y for v in bbox)
-        min_z = min(v.z for v in bbox)
-        max_z = max(v.z for v in bbox)
-
-        width_x = max_x - min_x
-        width_y = max_y - min_y
-        width_z = max_z - min_z
+        # Get bounding box and face centers in world space in one batch
+        mn, mx, world_centers = world_face_data(obj)
+        extents = mx - mn
 
         print(f"   Dimensions:")
-        print(f"     X: {width_x:.3f}")
-        print(f"     Y: {width_y:.3f}")
-        print(f"     Z: {width_z:.3f}")
+        for name, extent in zip(AXIS_NAMES, extents):
+            print(f"     {name.upper()}: {extent:.3f}")
 
         # Determine which axis is "up" (the smallest dimension is usually height for furniture)
         # For sofas: width > depth > height
         # So the SMALLEST dimension is likely the vertical axis (legs)
+        axis = int(extents.argmin())
+        vertical_axis = AXIS_NAMES[axis]
+        vertical_min, vertical_range = mn[axis], extents[axis]
+        print(f"   Detected: {vertical_axis.upper()} is vertical (height: {vertical_range:.3f})")
 
-        if width_y < width_x and width_y < width_z:
-            # Y is the vertical axis (height)
-            vertical_axis = 'y'
-            vertical_min = min_y
-            vertical_max = max_y
-            vertical_range = width_y
-            horizontal_1_range = width_x
-            horizontal_2_range = width_z
-            print(f"   Detected: Y is vertical (height: {vertical_range:.3f})")
-        elif width_z < width_x and width_z < width_y:
-            # Z is the vertical axis
-            vertical_axis = 'z'
-            vertical_min = min_z
-            vertical_max = max_z
-            vertical_range = width_z
-            horizontal_1_range = width_x
-            horizontal_2_range = width_y
-            print(f"   Detected: Z is vertical (height: {vertical_range:.3f})")
-        else:
-            # X is the vertical axis
-            vertical_axis = 'x'
-            vertical_min = min_x
-            vertical_max = max_x
-            vertical_range = width_x
-            horizontal_1_range = width_y
-            horizontal_2_range = width_z
-            print(f"   Detected: X is vertical (height: {vertical_range:.3f})")
-
-        # Create black material for legs (PURE BLACK, no reflections)
-        black_mat = bpy.data.materials.new(name="Black_Legs")
-        black_mat.use_nodes = True
-        bsdf = black_mat.node_tree.nodes["Principled BSDF"]
-        bsdf.inputs['Base Color'].default_value = (0.0, 0.0, 0.0, 1.0)  # Pure black
-        bsdf.inputs['Roughness'].default_value = 1.0  # Fully rough, no reflections
-        bsdf.inputs['Metallic'].default_value = 0.0  # Not metallic
-        bsdf.inputs['Specular IOR Level'].default_value = 0.0  # No specular highlights
-
-        # Add black material to object
-        if len(obj.data.materials) == 0:
-            obj.data.materials.append(black_mat)
-        else:
-            obj.data.materials.append(black_mat)
-
-        black_mat_index = len(obj.data.materials) - 1
-
-        # Enter edit mode
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        # Select faces in bottom 18.5% of height (just the legs)
-        leg_threshold = vertical_min + (vertical_range * 0.185)  # Bottom 18.5%
-
-        leg_faces = []
-        body_faces = []
-
-        for poly in obj.data.polygons:
-            # Get face center in world space
-            face_center_local = poly.center
-            face_center_world = obj.matrix_world @ face_center_local
-
-            # Get the vertical coordinate based on detected axis
-            if vertical_axis == 'y':
-                vertical_coord = face_center_world.y
-            elif vertical_axis == 'z':
-                vertical_coord = face_center_world.z
-            else:
-                vertical_coord = face_center_world.x
-
-            # Check if face is in leg region (bottom 15%)
-            if vertical_coord <= leg_threshold:
-                poly.select = True
-                leg_faces.append(poly)
-            else:
-                body_faces.append(poly)
-
-        print(f"   Found {len(leg_faces)} leg faces")
-        print(f"   Found {len(body_faces)} body faces")
-
-        if len(leg_faces) == 0:
-            print(f"   ⚠️  No leg faces found - trying different approach...")
+        # Add the shared black material to object
+        black_mat_index = len(obj.data.materials)
+        obj.data.materials.append(black_mat)
 
-            # Fallback: Just select bottom faces regardless of X position
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.select_all(action='DESELECT')
-            bpy.ops.object.mode_set(mode='OBJECT')
+        polys = obj.data.polygons
+        nf = len(polys)
 
-            for poly in obj.data.polygons:
-                face_center_local = poly.center
-                face_center_world = obj.matrix_world @ face_center_local
+        # Vertical coordinate of every face as one contiguous column, reused
+        # by the primary and fallback tests
+        heights = np.ascontiguousarray(world_centers[:, axis])
 
-                if face_center_world.y <= leg_threshold_y:
-                    poly.select = True
-                    leg_faces.append(poly)
+        # Split legs from the body at the height gap nearest the bottom 18.5%,
+        # or at 18.5% itself when the model has no clear gap
+        leg_threshold = find_leg_threshold(heights, vertical_min, vertical_range)
+        print(f"   Leg threshold: {leg_threshold:.3f} ({(leg_threshold - vertical_min) / vertical_range:.1%} of height)")
 
-            print(f"   Found {len(leg_faces)} bottom faces (fallback)")
+        # Faces in the leg region along the detected vertical axis
+        leg_mask = heights <= leg_threshold
+        leg_count = int(np.count_nonzero(leg_mask))
 
-        # Apply black material to selected faces
-        if len(leg_faces) > 0:
-            bpy.ops.object.mode_set(mode='EDIT')
+        print(f"   Found {leg_count} leg faces")
+        print(f"   Found {nf - leg_count} body faces")
 
-            # Assign black material to selection
-            bpy.context.object.active_material_index = black_mat_index
-            bpy.ops.object.material_slot_assign()
+        if leg_count == 0:
+            print(f"   ⚠️  No leg faces found - trying different approach...")
+
+            # Fallback: relax to the bottom 30% along the same vertical axis
+            leg_mask = heights <= vertical_min + (vertical_range * 0.30)
+            leg_count = int(np.count_nonzero(leg_mask))
+
+            print(f"   Found {leg_count} bottom faces (fallback)")
 
-            print(f"   ✓ Applied black material to {len(leg_faces)} faces")
+        if leg_count > 0:
+            # Write material indices directly, body faces keep their material
+            material_index = np.empty(nf, dtype=np.int32)
+            polys.foreach_get("material_index", material_index)
+            material_index[leg_mask] = black_mat_index
+            polys.foreach_set("material_index", material_index)
+            obj.data.update()
 
-        # Return to object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
+            print(f"   ✓ Applied black material to {leg_count} faces")
 
         print(f"   ✅ Complete")
 
     print(f"\n💾 Saving: {output_path}")
 
-    # Export GLB
-    bpy.ops.export_scene.gltf(
-        filepath=output_path,
-        export_format='GLB',
-        export_texcoords=True,
-        export_normals=True,
-        export_materials='EXPORT',
-        export_cameras=False,
-        export_lights=False
+    # Export GLB: only a material changed, so skip exporter features this
+    # script never needs. UVs are kept whenever any exported mesh has them,
+    # including the hidden ones skipped above
+    save_model(
+        output_path,
+        draco=draco,
+        export_texcoords=any(
+            len(obj.data.uv_layers)
+            for obj in bpy.context.scene.objects if obj.type == 'MESH'
+        ),
+        export_animations=False,
+        export_skins=False,
+        export_morph=False
     )
 
     print("✅ Complete!")
     return True
 
+def read_batch(source, output_dir=None):
+    """Return (input, output) path pairs from a JSON manifest or an input directory."""
+    if os.path.isdir(source):
+        os.makedirs(output_dir, exist_ok=True)
+        names = sorted(name for name in os.listdir(source) if name.lower().endswith('.glb'))
+        return [(os.path.join(source, name), os.path.join(output_dir, name)) for name in names]
+
+    with open(source) as f:
+        manifest = json.load(f)
+    if isinstance(manifest, dict):
+        return list(manifest.items())
+    return [tuple(pair) for pair in manifest]
+
+def make_legs_black_batch(pairs, draco=False):
+    """Run make_legs_black on every (input, output) pair in one Blender session."""
+    done = 0
+    for i, (input_path, output_path) in enumerate(pairs, 1):
+        print(f"\n📁 [{i}/{len(pairs)}]")
+        if not os.path.exists(input_path):
+            print(f"❌ Input file not found: {input_path}")
+            continue
+
+        # make_legs_black loads each file into a fresh scene (reset_scene),
+        # so one broken file does not affect the rest of the batch
+        try:
+            if make_legs_black(input_path, output_path, draco=draco):
+                done += 1
+        except Exception as e:
+            print(f"❌ Failed: {input_path}: {e}")
+
+    print(f"\n✅ Batch complete: {done}/{len(pairs)} files")
+    return done == len(pairs)
+
 def main():
     """Main entry point."""
     argv = sys.argv
     if "--" in argv:
         argv = argv[argv.index("--") + 1:]
     else:
-        print("Usage: blender --background --python make_legs_black_geometry.py -- <input.glb> <output.glb>")
+        print("Usage: blender --background --factory-startup --python make_legs_black_geometry.py -- <input.glb> <output.glb> [--draco]")
+        return
+
+    # Optional Draco mesh compression for smaller output files
+    draco = "--draco" in argv
+    argv = [arg for arg in argv if arg != "--draco"]
+
+    if argv and argv[0] == "--batch":
+        if len(argv) < 2:
+            print("Error: Need a manifest file or an input and output directory")
+            return
+        if os.path.isdir(argv[1]) and len(argv) < 3:
+            print("Error: Need an output directory for batch input directory")
+            return
+        # Non-zero exit code so pipelines notice files that failed
+        if not make_legs_black_batch(read_batch(*argv[1:3]), draco=draco):
+            sys.exit(1)
         return
 
     if len(argv) < 2:
@@ -213,7 +206,7 @@ def main():
         print(f"❌ Input file not found: {input_path}")
         return
 
-    make_legs_black(input_path, output_path)
+    make_legs_black(input_path, output_path, draco=draco)
 
 if __name__ == "__main__":
     main()
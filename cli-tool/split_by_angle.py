@@ -5,12 +5,16 @@ Separates vertical faces (legs) from angled/horizontal faces (fabric)
 """
 
 import bpy
-import bmesh
 import sys
 import math
 import os
+import numpy as np
 
-def split_by_angle(input_path, output_path, angle_threshold=30, z_threshold=0.5, height_percent=0.20):
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _meshkernels import classify_legs
+from _meshutil import face_centers, face_normals, load_model, save_model, vertex_coords
+
+def split_by_angle(input_path, output_path, angle_threshold=30, z_threshold=0.5, height_percent=0.20, draco=False):
     """
     Split GLB model by face angle AND position (hybrid approach).
 
@@ -21,6 +25,7 @@ def split_by_angle(input_path, output_path, angle_threshold=30, z_threshold=0.5,
         z_threshold: Z-component threshold for vertical detection (default: 0.5)
                     Lower = more vertical (0 = perfectly horizontal normal)
         height_percent: Bottom height percentage for legs (default: 0.20 = bottom 20%)
+        draco: Draco-compress the exported mesh data (default: False)
     """
 
     print(f"🔧 Split by Angle + Position (Hybrid)")
@@ -31,16 +36,14 @@ def split_by_angle(input_path, output_path, angle_threshold=30, z_threshold=0.5,
     print(f"   - Height %: {height_percent*100:.0f}% (bottom portion)")
     print()
 
-    # Clear scene
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
-
-    # Import GLB
+    # Load into a fresh scene
     print("📥 Loading GLB...")
-    bpy.ops.import_scene.gltf(filepath=input_path)
-
-    # Get all mesh objects
-    mesh_objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+    # Keep mesh objects, skipping hidden helpers and meshes without faces
+    mesh_objects = [
+        obj for obj in load_model(input_path)
+        if len(obj.data.polygons)
+        and not obj.hide_render and not obj.hide_get()
+    ]
 
     if not mesh_objects:
         print("❌ No mesh objects found in GLB")
@@ -48,34 +51,35 @@ def split_by_angle(input_path, output_path, angle_threshold=30, z_threshold=0.5,
 
     print(f"✅ Found {len(mesh_objects)} mesh object(s)")
 
+    # Create materials once if they don't exist (shared by every mesh)
+    legs_mat = bpy.data.materials.get("legs")
+    fabric_mat = bpy.data.materials.get("fabric")
+
+    if not legs_mat:
+        legs_mat = bpy.data.materials.new(name="legs")
+        legs_mat.use_nodes = True
+        # Set to dark color for visibility
+        if legs_mat.node_tree:
+            bsdf = legs_mat.node_tree.nodes.get('Principled BSDF')
+            if bsdf:
+                bsdf.inputs['Base Color'].default_value = (0.1, 0.1, 0.1, 1.0)
+
+    if not fabric_mat:
+        fabric_mat = bpy.data.materials.new(name="fabric")
+        fabric_mat.use_nodes = True
+
     total_legs_faces = 0
     total_fabric_faces = 0
 
     for obj in mesh_objects:
         print(f"\n🔍 Processing: {obj.name}")
 
-        # Select and make active
-        bpy.context.view_layer.objects.active = obj
-        obj.select_set(True)
-
-        # Enter edit mode
-        bpy.ops.object.mode_set(mode='EDIT')
-
-        # Get bmesh
         mesh = obj.data
-        bm = bmesh.from_edit_mesh(mesh)
-
-        # Ensure normals are updated
-        bm.normal_update()
-
-        # Deselect all
-        bpy.ops.mesh.select_all(action='DESELECT')
 
-        # Get model bounds to find bottom region
-        verts = [v.co for v in bm.verts]
-        z_coords = [v[2] for v in verts]
-        min_z = min(z_coords)
-        max_z = max(z_coords)
+        # Get model bounds to find bottom region (one batch read, no bmesh)
+        z_coords = vertex_coords(mesh)[:, 2]
+        min_z = float(z_coords.min())
+        max_z = float(z_coords.max())
         z_range = max_z - min_z
 
         # Bottom 20% of model (where legs typically are)
@@ -87,64 +91,31 @@ def split_by_angle(input_path, output_path, angle_threshold=30, z_threshold=0.5,
         print(f"      Range: {z_range:.3f}")
         print(f"      Leg threshold: {leg_height_threshold:.3f} (bottom 20%)")
 
-        # Analyze face normals AND position
-        legs_faces = []
-        fabric_faces = []
+        # Analyze face normals AND position, read in bulk (object space)
+        polys = mesh.polygons
+        nf = len(polys)
+        centers = face_centers(mesh)
+        normals = face_normals(mesh)
 
-        for face in bm.faces:
-            # Get face center position
-            face_center = face.calc_center_median()
+        # A face is a leg if:
+        # 1. It's in the bottom 20% of the model (position-based)
+        # 2. AND it's mostly vertical (pointing sideways, angle-based)
+        legs = classify_legs(centers[:, 2], normals[:, 2], leg_height_threshold, z_threshold)
 
-            # Get normal vector (in object space)
-            normal = face.normal
-
-            # A face is a leg if:
-            # 1. It's in the bottom 20% of the model (position-based)
-            # 2. AND it's mostly vertical (pointing sideways, angle-based)
-            is_at_bottom = face_center.z < leg_height_threshold
-            is_vertical = abs(normal.z) < z_threshold
-
-            if is_at_bottom and is_vertical:
-                legs_faces.append(face)
-                face.select = True
-            else:
-                fabric_faces.append(face)
+        legs_count = int(np.count_nonzero(legs))
+        fabric_count = nf - legs_count
 
         print(f"   📊 Analysis:")
-        print(f"      Vertical faces (legs): {len(legs_faces)}")
-        print(f"      Angled faces (fabric): {len(fabric_faces)}")
+        print(f"      Vertical faces (legs): {legs_count}")
+        print(f"      Angled faces (fabric): {fabric_count}")
 
-        total_legs_faces += len(legs_faces)
-        total_fabric_faces += len(fabric_faces)
+        total_legs_faces += legs_count
+        total_fabric_faces += fabric_count
 
-        if len(legs_faces) == 0:
+        if legs_count == 0:
             print(f"   ⚠️  No vertical faces found - skipping material split")
-            bpy.ops.object.mode_set(mode='OBJECT')
             continue
 
-        # Create materials if they don't exist
-        legs_mat = None
-        fabric_mat = None
-
-        for mat in bpy.data.materials:
-            if mat.name == "legs":
-                legs_mat = mat
-            elif mat.name == "fabric":
-                fabric_mat = mat
-
-        if not legs_mat:
-            legs_mat = bpy.data.materials.new(name="legs")
-            legs_mat.use_nodes = True
-            # Set to dark color for visibility
-            if legs_mat.node_tree:
-                bsdf = legs_mat.node_tree.nodes.get('Principled BSDF')
-                if bsdf:
-                    bsdf.inputs['Base Color'].default_value = (0.1, 0.1, 0.1, 1.0)
-
-        if not fabric_mat:
-            fabric_mat = bpy.data.materials.new(name="fabric")
-            fabric_mat.use_nodes = True
-
         # Assign materials to object slots
         if len(obj.data.materials) == 0:
             obj.data.materials.append(fabric_mat)
@@ -157,33 +128,22 @@ def split_by_angle(input_path, output_path, angle_threshold=30, z_threshold=0.5,
             else:
                 obj.data.materials[1] = legs_mat
 
-        legs_mat_index = 1
-        fabric_mat_index = 0
-
-        # Assign legs material to selected faces
-        for face in legs_faces:
-            face.material_index = legs_mat_index
-
-        # Assign fabric material to other faces
-        for face in fabric_faces:
-            face.material_index = fabric_mat_index
-
-        bmesh.update_edit_mesh(mesh)
-
-        # Back to object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
+        # Legs get slot 1, everything else the fabric slot (0): that is
+        # exactly the classify_legs output, so write it back as-is
+        polys.foreach_set("material_index", legs)
+        mesh.update()
 
         print(f"   ✅ Materials assigned:")
-        print(f"      - 'legs' material: {len(legs_faces)} faces")
-        print(f"      - 'fabric' material: {len(fabric_faces)} faces")
+        print(f"      - 'legs' material: {legs_count} faces")
+        print(f"      - 'fabric' material: {fabric_count} faces")
+
+    # Drop datablocks left without users (e.g. the replaced source materials
+    # and their images) so the exporter has less to walk
+    bpy.data.orphans_purge(do_recursive=True)
 
     # Export GLB
     print(f"\n💾 Exporting to: {output_path}")
-    bpy.ops.export_scene.gltf(
-        filepath=output_path,
-        export_format='GLB',
-        export_materials='EXPORT'
-    )
+    save_model(output_path, draco=draco)
 
     # Get file size
     file_size = os.path.getsize(output_path)
@@ -203,18 +163,22 @@ def split_by_angle(input_path, output_path, angle_threshold=30, z_threshold=0.5,
 
 if __name__ == "__main__":
     # Parse arguments
-    # Usage: blender --background --python split_by_angle.py -- input.glb output.glb [z_threshold]
+    # Usage: blender --background --factory-startup --python split_by_angle.py -- input.glb output.glb [z_threshold] [--draco]
 
     argv = sys.argv
     if "--" in argv:
         argv = argv[argv.index("--") + 1:]
     else:
-        print("❌ Usage: blender --background --python split_by_angle.py -- input.glb output.glb [z_threshold]")
+        print("❌ Usage: blender --background --factory-startup --python split_by_angle.py -- input.glb output.glb [z_threshold] [--draco]")
         sys.exit(1)
 
+    # Optional Draco mesh compression for smaller output files
+    draco = "--draco" in argv
+    argv = [arg for arg in argv if arg != "--draco"]
+
     if len(argv) < 2:
         print("❌ Error: Need input and output paths")
-        print("Usage: blender --background --python split_by_angle.py -- input.glb output.glb [z_threshold]")
+        print("Usage: blender --background --factory-startup --python split_by_angle.py -- input.glb output.glb [z_threshold] [--draco]")
         sys.exit(1)
 
     input_path = argv[0]
@@ -225,4 +189,4 @@ if __name__ == "__main__":
         print(f"❌ Input file not found: {input_path}")
         sys.exit(1)
 
-    split_by_angle(input_path, output_path, z_threshold=z_threshold)
+    split_by_angle(input_path, output_path, z_threshold=z_threshold, draco=draco)